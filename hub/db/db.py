@@ -503,15 +503,16 @@ class SecondaryDB:
                 amount = v.activated_sum - v.activated_support_sum
             if height == self.db_height + 1:
                 return amount
-            return amount + sum(
-                v.amount for v in self.prefix_db.active_amount.iterate(
+            return amount + self.prefix_db.active_amount.sum_amounts(
+                self.prefix_db.active_amount.iterate(
                     start=(claim_hash, txo_type, self.db_height + 1),
-                    stop=(claim_hash, txo_type, height), include_key=False
+                    stop=(claim_hash, txo_type, height), include_key=False, deserialize_value=False
                 )
             )
-        return sum(
-            v.amount for v in self.prefix_db.active_amount.iterate(
-                start=(claim_hash, txo_type, 0), stop=(claim_hash, txo_type, height), include_key=False
+        return self.prefix_db.active_amount.sum_amounts(
+            self.prefix_db.active_amount.iterate(
+                start=(claim_hash, txo_type, 0), stop=(claim_hash, txo_type, height),
+                include_key=False, deserialize_value=False
             )
         )
 
@@ -883,7 +884,7 @@ class SecondaryDB:
         stop = self.prefix_db.claim_short_id.pack_partial_key(name) + int(2).to_bytes(1, byteorder='big')
         cf = self.prefix_db.column_families[self.prefix_db.claim_short_id.prefix]
         for v in self.prefix_db.iterator(column_family=cf, start=prefix, iterate_upper_bound=stop, include_key=False):
-            tx_num, nout = self.prefix_db.claim_short_id.unpack_value(v)
+            tx_num, nout = self.prefix_db.claim_short_id.unpack_value_tuple(v)
             txos[self.get_claim_from_txo(tx_num, nout).claim_hash] = tx_num, nout
         return txos
 
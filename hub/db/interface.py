@@ -10,6 +10,25 @@ from hub.db.revertable import RevertableOpStack, RevertablePut, RevertableDelete
 ROW_TYPES = {}
 
 
+def _gen_pack_key(prefix: bytes, key_struct: struct.Struct):
+    # specialize pack_key per row by folding the prefix byte into the key
+    # format itself, so a call is one C pack producing one bytes object
+    # with no class attribute lookups or concat
+    fmt = key_struct.format
+    if isinstance(fmt, bytes):
+        fmt = fmt.decode()
+    full_struct = struct.Struct('>1s' + fmt.lstrip('>'))
+    namespace = {'_pack': full_struct.pack}
+    exec(f"def pack_key(cls, *args):\n    return _pack({prefix!r}, *args)", namespace)
+    return classmethod(namespace['pack_key'])
+
+
+def _gen_pack_value(value_struct: struct.Struct):
+    namespace = {'_pack': value_struct.pack}
+    exec("def pack_value(cls, *args):\n    return _pack(*args)", namespace)
+    return classmethod(namespace['pack_value'])
+
+
 class PrefixRowType(type):
     def __new__(cls, name, bases, kwargs):
         klass = super().__new__(cls, name, bases, kwargs)
@@ -19,14 +38,33 @@ class PrefixRowType(type):
             COLUMN_SETTINGS[klass.prefix] = {
                 'cache_size': cache_size,
             }
+        # bind the C pack/unpack methods once per class so the hot row
+        # serializers skip two attribute lookups per call
+        if name != "PrefixRow":
+            klass._prefix_byte = klass.prefix[0]
+        key_struct = getattr(klass, 'key_struct', None)
+        if key_struct is not None:
+            klass._key_pack = key_struct.pack
+            klass._key_unpack = key_struct.unpack
+            klass._key_unpack_from = key_struct.unpack_from
+            if name != "PrefixRow" and 'pack_key' not in kwargs:
+                klass.pack_key = _gen_pack_key(klass.prefix, key_struct)
+        value_struct = getattr(klass, 'value_struct', None)
+        if value_struct is not None:
+            klass._value_pack = value_struct.pack
+            klass._value_unpack = value_struct.unpack
+            klass._value_unpack_from = value_struct.unpack_from
+            if name != "PrefixRow" and 'pack_value' not in kwargs:
+                klass.pack_value = _gen_pack_value(value_struct)
         return klass
 
 
 class PrefixRow(metaclass=PrefixRowType):
     prefix: bytes
+    _prefix_byte: int
     key_struct: struct.Struct
     value_struct: struct.Struct
-    key_part_lambdas = []
+    key_part_lambdas = ()
     cache_size: int = 1024 * 1024 * 16
 
     def __init__(self, db: 'rocksdb.DB', op_stack: RevertableOpStack):
@@ -149,24 +187,54 @@ class PrefixRow(metaclass=PrefixRowType):
 
     @classmethod
     def pack_partial_key(cls, *args) -> bytes:
+        if not args:
+            return cls.prefix
         return cls.prefix + cls.key_part_lambdas[len(args)](*args)
 
     @classmethod
     def pack_key(cls, *args) -> bytes:
-        return cls.prefix + cls.key_struct.pack(*args)
+        return cls.prefix + cls._key_pack(*args)
 
     @classmethod
     def pack_value(cls, *args) -> bytes:
-        return cls.value_struct.pack(*args)
+        return cls._value_pack(*args)
 
     @classmethod
     def unpack_key(cls, key: bytes):
-        assert key[:1] == cls.prefix, f"prefix should be {cls.prefix}, got {key[:1]}"
-        return cls.key_struct.unpack(key[1:])
+        assert key[0] == cls._prefix_byte, f"prefix should be {cls.prefix}, got {key[:1]}"
+        return cls._key_unpack_from(key, 1)
 
     @classmethod
     def unpack_value(cls, data: bytes):
-        return cls.value_struct.unpack(data)
+        return cls._value_unpack(data)
+
+    @classmethod
+    def unpack_key_tuple(cls, key: bytes) -> tuple:
+        # bare-tuple fast path for fixed-schema keys: skips building the
+        # NamedTuple for rows that are destructured and discarded.
+        # struct.unpack requires an exact length, so variable-length rows
+        # fail loudly rather than decode wrong.
+        assert key[0] == cls._prefix_byte, f"prefix should be {cls.prefix}, got {key[:1]}"
+        return cls._key_unpack(key[1:])
+
+    @classmethod
+    def unpack_value_tuple(cls, data: bytes) -> tuple:
+        return cls._value_unpack(data)
+
+    @classmethod
+    def pack_key_into(cls, buf: bytearray, offset: int, *args) -> int:
+        # write a fixed-schema key into a caller-owned scratch buffer and
+        # return the bytes written, for batch producers that reuse one
+        # allocation; rows with variable-length keys fail loudly since
+        # their extra args do not match the fixed struct
+        buf[offset] = cls._prefix_byte
+        cls.key_struct.pack_into(buf, offset + 1, *args)
+        return 1 + cls.key_struct.size
+
+    @classmethod
+    def pack_value_into(cls, buf: bytearray, offset: int, *args) -> int:
+        cls.value_struct.pack_into(buf, offset, *args)
+        return cls.value_struct.size
 
     @classmethod
     def unpack_item(cls, key: bytes, value: bytes):
@@ -1,7 +1,9 @@
+import sys
 import typing
 import struct
 import array
-import base64
+from functools import lru_cache
+from itertools import groupby
 from typing import Union, Tuple, NamedTuple, Optional
 from hub.common import ResumableSHA256
 from hub.db.common import DB_PREFIXES
@@ -12,13 +14,70 @@ ACTIVATED_CLAIM_TXO_TYPE = 1
 ACTIVATED_SUPPORT_TXO_TYPE = 2
 
 
+_U16 = struct.Struct(b'>H')
+_u16_pack = _U16.pack
+_u16_unpack_from = _U16.unpack_from
+_B = struct.Struct(b'>B')
+_b_pack = _B.pack
+
+
+@lru_cache(maxsize=4096)
+def _decoded_name(encoded: bytes) -> str:
+    return encoded.decode()
+
+
+def _sum_packed_u64(raw_values: typing.Iterable[bytes]) -> int:
+    # decode a scan's worth of packed big-endian uint64 amounts in one
+    # C pass instead of a struct unpack per row
+    amounts = array.array('Q')
+    amounts.frombytes(b''.join(raw_values))
+    if sys.byteorder == 'little':
+        amounts.byteswap()
+    return sum(amounts)
+
+
+@lru_cache(maxsize=1024)
+def _hash_list_struct(item_size: int, count: int) -> struct.Struct:
+    # one Struct per (element size, count); lets a whole hash-list value
+    # unpack in a single C call
+    return struct.Struct(f'{item_size}s' * count)
+
+
+_U64_MAX = 0xffffffffffffffff
+
+
+def _invert_u64(value: int) -> int:
+    # ones' complement within 64 bits; maps ascending amounts onto a
+    # descending key order and is its own inverse
+    return _U64_MAX ^ value
+
+
+@lru_cache(maxsize=4096)
+def _encoded_name(name: str) -> bytes:
+    return name.encode('utf-8')
+
+
+@lru_cache(maxsize=4096)
 def length_encoded_name(name: str) -> bytes:
-    encoded = name.encode('utf-8')
-    return len(encoded).to_bytes(2, byteorder='big') + encoded
+    encoded = _encoded_name(name)
+    return _u16_pack(len(encoded)) + encoded
+
+
+@lru_cache(maxsize=4096)
+def _name_key_head(prefix: bytes, name: str) -> bytes:
+    encoded = _encoded_name(name)
+    return prefix + _u16_pack(len(encoded)) + encoded
 
 
 def length_prefix(key: str) -> bytes:
-    return len(key).to_bytes(1, byteorder='big') + key.encode()
+    return _b_pack(len(key)) + key.encode()
+
+
+@lru_cache(maxsize=4096)
+def _fused_struct(fmt: str) -> struct.Struct:
+    # formats embedding a name length, eg '>LHLHQBH5s'; caching keeps one
+    # Struct per (schema, name length) so variable rows pack in one allocation
+    return struct.Struct(fmt)
 
 
 class UTXOKey(NamedTuple):
@@ -26,10 +85,6 @@ class UTXOKey(NamedTuple):
     tx_num: int
     nout: int
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(hashX={self.hashX.hex()}, tx_num={self.tx_num}, nout={self.nout})"
-
-
 class UTXOValue(NamedTuple):
     amount: int
 
@@ -39,25 +94,13 @@ class HashXUTXOKey(NamedTuple):
     tx_num: int
     nout: int
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(short_tx_hash={self.short_tx_hash.hex()}, tx_num={self.tx_num}, nout={self.nout})"
-
-
 class HashXUTXOValue(NamedTuple):
     hashX: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(hashX={self.hashX.hex()})"
-
-
 class HashXHistoryKey(NamedTuple):
     hashX: bytes
     height: int
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(hashX={self.hashX.hex()}, height={self.height})"
-
-
 class HashXHistoryValue(NamedTuple):
     tx_nums: typing.List[int]
 
@@ -69,10 +112,6 @@ class BlockHashKey(NamedTuple):
 class BlockHashValue(NamedTuple):
     block_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(block_hash={self.block_hash.hex()})"
-
-
 class BlockTxsKey(NamedTuple):
     height: int
 
@@ -96,17 +135,9 @@ class TxHashKey(NamedTuple):
 class TxHashValue(NamedTuple):
     tx_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(tx_hash={self.tx_hash[::-1].hex()})"
-
-
 class TxNumKey(NamedTuple):
     tx_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(tx_hash={self.tx_hash[::-1].hex()})"
-
-
 class TxNumValue(NamedTuple):
     tx_num: int
 
@@ -114,17 +145,9 @@ class TxNumValue(NamedTuple):
 class TxKey(NamedTuple):
     tx_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(tx_hash={self.tx_hash[::-1].hex()})"
-
-
 class TxValue(NamedTuple):
     raw_tx: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(raw_tx={base64.b64encode(self.raw_tx).decode()})"
-
-
 class BlockHeaderKey(NamedTuple):
     height: int
 
@@ -132,15 +155,15 @@ class BlockHeaderKey(NamedTuple):
 class BlockHeaderValue(NamedTuple):
     header: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(header={base64.b64encode(self.header)})"
-
-
 class ClaimToTXOKey(typing.NamedTuple):
     claim_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()})"
+@lru_cache(maxsize=4096)
+def _cached_normalized_name(name: str) -> str:
+    try:
+        return normalize_name(name)
+    except UnicodeDecodeError:
+        return name
 
 
 class ClaimToTXOValue(typing.NamedTuple):
@@ -155,10 +178,9 @@ class ClaimToTXOValue(typing.NamedTuple):
 
     @property
     def normalized_name(self) -> str:
-        try:
-            return normalize_name(self.name)
-        except UnicodeDecodeError:
-            return self.name
+        # claims for the same name are decoded over and over during
+        # takeover processing; normalize each distinct name once
+        return _cached_normalized_name(self.name)
 
 
 class TXOToClaimKey(typing.NamedTuple):
@@ -170,22 +192,12 @@ class TXOToClaimValue(typing.NamedTuple):
     claim_hash: bytes
     name: str
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()}, name={self.name})"
-
-
 class ClaimShortIDKey(typing.NamedTuple):
     normalized_name: str
     partial_claim_id: str
     root_tx_num: int
     root_position: int
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(normalized_name={self.normalized_name}, " \
-               f"partial_claim_id={self.partial_claim_id}, " \
-               f"root_tx_num={self.root_tx_num}, root_position={self.root_position})"
-
-
 class ClaimShortIDValue(typing.NamedTuple):
     tx_num: int
     position: int
@@ -196,43 +208,21 @@ class ClaimToChannelKey(typing.NamedTuple):
     tx_num: int
     position: int
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()}, " \
-               f"tx_num={self.tx_num}, position={self.position})"
-
-
 class ClaimToChannelValue(typing.NamedTuple):
     signing_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(signing_hash={self.signing_hash.hex()})"
-
-
 class ChannelToClaimKey(typing.NamedTuple):
     signing_hash: bytes
     name: str
     tx_num: int
     position: int
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(signing_hash={self.signing_hash.hex()}, name={self.name}, " \
-               f"tx_num={self.tx_num}, position={self.position})"
-
-
 class ChannelToClaimValue(typing.NamedTuple):
     claim_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()})"
-
-
 class ChannelCountKey(typing.NamedTuple):
     channel_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(channel_hash={self.channel_hash.hex()})"
-
-
 class ChannelCountValue(typing.NamedTuple):
     count: int
 
@@ -240,10 +230,6 @@ class ChannelCountValue(typing.NamedTuple):
 class SupportAmountKey(typing.NamedTuple):
     claim_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()})"
-
-
 class SupportAmountValue(typing.NamedTuple):
     amount: int
 
@@ -253,11 +239,6 @@ class ClaimToSupportKey(typing.NamedTuple):
     tx_num: int
     position: int
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()}, tx_num={self.tx_num}, " \
-               f"position={self.position})"
-
-
 class ClaimToSupportValue(typing.NamedTuple):
     amount: int
 
@@ -270,10 +251,6 @@ class SupportToClaimKey(typing.NamedTuple):
 class SupportToClaimValue(typing.NamedTuple):
     claim_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()})"
-
-
 class ClaimExpirationKey(typing.NamedTuple):
     expiration: int
     tx_num: int
@@ -284,10 +261,6 @@ class ClaimExpirationValue(typing.NamedTuple):
     claim_hash: bytes
     normalized_name: str
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()}, normalized_name={self.normalized_name})"
-
-
 class ClaimTakeoverKey(typing.NamedTuple):
     normalized_name: str
 
@@ -296,10 +269,6 @@ class ClaimTakeoverValue(typing.NamedTuple):
     claim_hash: bytes
     height: int
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()}, height={self.height})"
-
-
 class PendingActivationKey(typing.NamedTuple):
     height: int
     txo_type: int
@@ -319,10 +288,6 @@ class PendingActivationValue(typing.NamedTuple):
     claim_hash: bytes
     normalized_name: str
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()}, normalized_name={self.normalized_name})"
-
-
 class ActivationKey(typing.NamedTuple):
     txo_type: int
     tx_num: int
@@ -334,11 +299,6 @@ class ActivationValue(typing.NamedTuple):
     claim_hash: bytes
     normalized_name: str
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(height={self.height}, claim_hash={self.claim_hash.hex()}, " \
-               f"normalized_name={self.normalized_name})"
-
-
 class ActiveAmountKey(typing.NamedTuple):
     claim_hash: bytes
     txo_type: int
@@ -346,11 +306,6 @@ class ActiveAmountKey(typing.NamedTuple):
     tx_num: int
     position: int
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()}, txo_type={self.txo_type}, " \
-               f"activation_height={self.activation_height}, tx_num={self.tx_num}, position={self.position})"
-
-
 class ActiveAmountValue(typing.NamedTuple):
     amount: int
 
@@ -365,54 +320,35 @@ class BidOrderKey(typing.NamedTuple):
 class BidOrderValue(typing.NamedTuple):
     claim_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()})"
-
-
 class RepostKey(typing.NamedTuple):
     claim_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()})"
-
-
 class RepostValue(typing.NamedTuple):
     reposted_claim_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(reposted_claim_hash={self.reposted_claim_hash.hex()})"
-
-
 class RepostedKey(typing.NamedTuple):
     reposted_claim_hash: bytes
     tx_num: int
     position: int
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(reposted_claim_hash={self.reposted_claim_hash.hex()}, " \
-               f"tx_num={self.tx_num}, position={self.position})"
-
-
 class RepostedValue(typing.NamedTuple):
     claim_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(claim_hash={self.claim_hash.hex()})"
-
-
 class TouchedOrDeletedClaimKey(typing.NamedTuple):
     height: int
 
 
 class TouchedOrDeletedClaimValue(typing.NamedTuple):
-    touched_claims: typing.Set[bytes]
-    deleted_claims: typing.Set[bytes]
+    touched_blob: bytes
+    deleted_blob: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(" \
-               f"touched_claims={','.join(map(lambda x: x.hex(), self.touched_claims))}," \
-               f"deleted_claims={','.join(map(lambda x: x.hex(), self.deleted_claims))})"
+    @property
+    def touched_claims(self) -> typing.FrozenSet[bytes]:
+        return frozenset(_hash_list_struct(20, len(self.touched_blob) // 20).unpack(self.touched_blob))
 
+    @property
+    def deleted_claims(self) -> typing.FrozenSet[bytes]:
+        return frozenset(_hash_list_struct(20, len(self.deleted_blob) // 20).unpack(self.deleted_blob))
 
 class DBState(typing.NamedTuple):
     genesis: bytes
@@ -461,31 +397,28 @@ class ActiveAmountPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.active_amount.value
     key_struct = struct.Struct(b'>20sBLLH')
     value_struct = struct.Struct(b'>Q')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack,
         struct.Struct(b'>20sB').pack,
         struct.Struct(b'>20sBL').pack,
         struct.Struct(b'>20sBLL').pack,
         struct.Struct(b'>20sBLLH').pack
-    ]
+    )
     cache_size = 1024 * 1024 * 64
 
-    @classmethod
-    def pack_key(cls, claim_hash: bytes, txo_type: int, activation_height: int, tx_num: int, position: int):
-        return super().pack_key(claim_hash, txo_type, activation_height, tx_num, position)
-
     @classmethod
     def unpack_key(cls, key: bytes) -> ActiveAmountKey:
-        return ActiveAmountKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return ActiveAmountKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> ActiveAmountValue:
-        return ActiveAmountValue(*super().unpack_value(data))
+        return ActiveAmountValue(*cls._value_unpack(data))
 
     @classmethod
-    def pack_value(cls, amount: int) -> bytes:
-        return cls.value_struct.pack(amount)
+    def sum_amounts(cls, raw_values: typing.Iterable[bytes]) -> int:
+        return _sum_packed_u64(raw_values)
 
     @classmethod
     def pack_item(cls, claim_hash: bytes, txo_type: int, activation_height: int, tx_num: int, position: int, amount: int):
@@ -496,28 +429,23 @@ class ClaimToTXOPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.claim_to_txo.value
     key_struct = struct.Struct(b'>20s')
     value_struct = struct.Struct(b'>LHLHQB')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack
-    ]
+    )
     cache_size = 1024 * 1024 * 64
 
-    @classmethod
-    def pack_key(cls, claim_hash: bytes):
-        return super().pack_key(claim_hash)
-
     @classmethod
     def unpack_key(cls, key: bytes) -> ClaimToTXOKey:
-        assert key[:1] == cls.prefix and len(key) == 21
+        assert key[0] == cls._prefix_byte and len(key) == 21
         return ClaimToTXOKey(key[1:])
 
     @classmethod
     def unpack_value(cls, data: bytes) -> ClaimToTXOValue:
-        tx_num, position, root_tx_num, root_position, amount, channel_signature_is_valid = cls.value_struct.unpack(
-            data[:21]
-        )
-        name_len = int.from_bytes(data[21:23], byteorder='big')
-        name = data[23:23 + name_len].decode()
+        tx_num, position, root_tx_num, root_position, amount, channel_signature_is_valid = \
+            cls._value_unpack_from(data)
+        name_len = _u16_unpack_from(data, 21)[0]
+        name = _decoded_name(data[23:23 + name_len])
         return ClaimToTXOValue(
             tx_num, position, root_tx_num, root_position, amount, bool(channel_signature_is_valid), name
         )
@@ -525,9 +453,11 @@ class ClaimToTXOPrefixRow(PrefixRow):
     @classmethod
     def pack_value(cls, tx_num: int, position: int, root_tx_num: int, root_position: int, amount: int,
                    channel_signature_is_valid: bool, name: str) -> bytes:
-        return cls.value_struct.pack(
-            tx_num, position, root_tx_num, root_position, amount, int(channel_signature_is_valid)
-        ) + length_encoded_name(name)
+        encoded = _encoded_name(name)
+        return _fused_struct(f'>LHLHQBH{len(encoded)}s').pack(
+            tx_num, position, root_tx_num, root_position, amount, int(channel_signature_is_valid),
+            len(encoded), encoded
+        )
 
     @classmethod
     def pack_item(cls, claim_hash: bytes, tx_num: int, position: int, root_tx_num: int, root_position: int,
@@ -542,24 +472,22 @@ class TXOToClaimPrefixRow(PrefixRow):
     value_struct = struct.Struct(b'>20s')
     cache_size = 1024 * 1024 * 64
 
-    @classmethod
-    def pack_key(cls, tx_num: int, position: int):
-        return super().pack_key(tx_num, position)
-
     @classmethod
     def unpack_key(cls, key: bytes) -> TXOToClaimKey:
-        return TXOToClaimKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return TXOToClaimKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> TXOToClaimValue:
-        claim_hash, = cls.value_struct.unpack(data[:20])
-        name_len = int.from_bytes(data[20:22], byteorder='big')
-        name = data[22:22 + name_len].decode()
+        claim_hash, = cls._value_unpack_from(data)
+        name_len = _u16_unpack_from(data, 20)[0]
+        name = _decoded_name(data[22:22 + name_len])
         return TXOToClaimValue(claim_hash, name)
 
     @classmethod
     def pack_value(cls, claim_hash: bytes, name: str) -> bytes:
-        return cls.value_struct.pack(claim_hash) + length_encoded_name(name)
+        encoded = _encoded_name(name)
+        return _fused_struct(f'>20sH{len(encoded)}s').pack(claim_hash, len(encoded), encoded)
 
     @classmethod
     def pack_item(cls, tx_num: int, position: int, claim_hash: bytes, name: str):
@@ -583,33 +511,31 @@ class ClaimShortIDPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.claim_short_id_prefix.value
     key_struct = struct.Struct(b'>LH')
     value_struct = struct.Struct(b'>LH')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         length_encoded_name,
         shortid_key_partial_claim_helper
-    ]
+    )
 
     @classmethod
     def pack_key(cls, name: str, short_claim_id: str, root_tx_num: int, root_position: int):
-        return cls.prefix + length_encoded_name(name) + length_prefix(short_claim_id) +\
-               cls.key_struct.pack(root_tx_num, root_position)
-
-    @classmethod
-    def pack_value(cls, tx_num: int, position: int):
-        return super().pack_value(tx_num, position)
+        encoded_claim_id = short_claim_id.encode()
+        return _name_key_head(cls.prefix, name) + _fused_struct(f'>B{len(encoded_claim_id)}sLH').pack(
+            len(encoded_claim_id), encoded_claim_id, root_tx_num, root_position
+        )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> ClaimShortIDKey:
-        assert key[:1] == cls.prefix
-        name_len = int.from_bytes(key[1:3], byteorder='big')
-        name = key[3:3 + name_len].decode()
-        claim_id_len = int.from_bytes(key[3+name_len:4+name_len], byteorder='big')
+        assert key[0] == cls._prefix_byte
+        name_len = _u16_unpack_from(key, 1)[0]
+        name = _decoded_name(key[3:3 + name_len])
+        claim_id_len = key[3 + name_len]
         partial_claim_id = key[4+name_len:4+name_len+claim_id_len].decode()
-        return ClaimShortIDKey(name, partial_claim_id, *cls.key_struct.unpack(key[4 + name_len + claim_id_len:]))
+        return ClaimShortIDKey(name, partial_claim_id, *cls._key_unpack_from(key, 4 + name_len + claim_id_len))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> ClaimShortIDValue:
-        return ClaimShortIDValue(*super().unpack_value(data))
+        return ClaimShortIDValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, name: str, partial_claim_id: str, root_tx_num: int, root_position: int,
@@ -623,28 +549,21 @@ class ClaimToChannelPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>20sLH')
     value_struct = struct.Struct(b'>20s')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack,
         struct.Struct(b'>20sL').pack,
         struct.Struct(b'>20sLH').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, claim_hash: bytes, tx_num: int, position: int):
-        return super().pack_key(claim_hash, tx_num, position)
-
-    @classmethod
-    def pack_value(cls, signing_hash: bytes):
-        return super().pack_value(signing_hash)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> ClaimToChannelKey:
-        return ClaimToChannelKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return ClaimToChannelKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> ClaimToChannelValue:
-        return ClaimToChannelValue(*super().unpack_value(data))
+        return ClaimToChannelValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, claim_hash: bytes, tx_num: int, position: int, signing_hash: bytes):
@@ -655,7 +574,7 @@ def channel_to_claim_helper(struct_fmt):
     packer = struct.Struct(struct_fmt).pack
 
     def wrapper(signing_hash: bytes, name: str, *args):
-        return signing_hash + length_encoded_name(name) + packer(*args)
+        return b''.join((signing_hash, length_encoded_name(name), packer(*args)))
 
     return wrapper
 
@@ -665,39 +584,36 @@ class ChannelToClaimPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>LH')
     value_struct = struct.Struct(b'>20s')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack,
         channel_to_claim_helper(b''),
         channel_to_claim_helper(b'>s'),
         channel_to_claim_helper(b'>L'),
         channel_to_claim_helper(b'>LH'),
-    ]
+    )
 
     @classmethod
     def pack_key(cls, signing_hash: bytes, name: str, tx_num: int, position: int):
-        return cls.prefix + signing_hash + length_encoded_name(name) + cls.key_struct.pack(
-            tx_num, position
+        encoded = _encoded_name(name)
+        return _fused_struct(f'>1s20sH{len(encoded)}sLH').pack(
+            cls.prefix, signing_hash, len(encoded), encoded, tx_num, position
         )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> ChannelToClaimKey:
-        assert key[:1] == cls.prefix
+        assert key[0] == cls._prefix_byte
         signing_hash = key[1:21]
-        name_len = int.from_bytes(key[21:23], byteorder='big')
-        name = key[23:23 + name_len].decode()
-        tx_num, position = cls.key_struct.unpack(key[23 + name_len:])
+        name_len = _u16_unpack_from(key, 21)[0]
+        name = _decoded_name(key[23:23 + name_len])
+        tx_num, position = cls._key_unpack_from(key, 23 + name_len)
         return ChannelToClaimKey(
             signing_hash, name, tx_num, position
         )
 
-    @classmethod
-    def pack_value(cls, claim_hash: bytes) -> bytes:
-        return super().pack_value(claim_hash)
-
     @classmethod
     def unpack_value(cls, data: bytes) -> ChannelToClaimValue:
-        return ChannelToClaimValue(*cls.value_struct.unpack(data))
+        return ChannelToClaimValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, signing_hash: bytes, name: str, tx_num: int, position: int,
@@ -711,55 +627,45 @@ class ClaimToSupportPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>20sLH')
     value_struct = struct.Struct(b'>Q')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack,
         struct.Struct(b'>20sL').pack,
         struct.Struct(b'>20sLH').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, claim_hash: bytes, tx_num: int, position: int):
-        return super().pack_key(claim_hash, tx_num, position)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> ClaimToSupportKey:
-        return ClaimToSupportKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, amount: int) -> bytes:
-        return super().pack_value(amount)
+        assert key[0] == cls._prefix_byte
+        return ClaimToSupportKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> ClaimToSupportValue:
-        return ClaimToSupportValue(*super().unpack_value(data))
+        return ClaimToSupportValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, claim_hash: bytes, tx_num: int, position: int, amount: int):
         return cls.pack_key(claim_hash, tx_num, position), \
                cls.pack_value(amount)
 
+    @classmethod
+    def sum_amounts(cls, raw_values: typing.Iterable[bytes]) -> int:
+        return _sum_packed_u64(raw_values)
+
 
 class SupportToClaimPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.support_to_claim.value
     key_struct = struct.Struct(b'>LH')
     value_struct = struct.Struct(b'>20s')
 
-    @classmethod
-    def pack_key(cls, tx_num: int, position: int):
-        return super().pack_key(tx_num, position)
-
     @classmethod
     def unpack_key(cls, key: bytes) -> SupportToClaimKey:
-        return SupportToClaimKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, claim_hash: bytes) -> bytes:
-        return super().pack_value(claim_hash)
+        assert key[0] == cls._prefix_byte
+        return SupportToClaimKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> SupportToClaimValue:
-        return SupportToClaimValue(*super().unpack_value(data))
+        return SupportToClaimValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, tx_num: int, position: int, claim_hash: bytes):
@@ -771,20 +677,17 @@ class ClaimExpirationPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.claim_expiration.value
     key_struct = struct.Struct(b'>LLH')
     value_struct = struct.Struct(b'>20s')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>L').pack,
         struct.Struct(b'>LL').pack,
         struct.Struct(b'>LLH').pack,
-    ]
-
-    @classmethod
-    def pack_key(cls, expiration: int, tx_num: int, position: int) -> bytes:
-        return super().pack_key(expiration, tx_num, position)
+    )
 
     @classmethod
     def pack_value(cls, claim_hash: bytes, name: str) -> bytes:
-        return cls.value_struct.pack(claim_hash) + length_encoded_name(name)
+        encoded = _encoded_name(name)
+        return _fused_struct(f'>20sH{len(encoded)}s').pack(claim_hash, len(encoded), encoded)
 
     @classmethod
     def pack_item(cls, expiration: int, tx_num: int, position: int, claim_hash: bytes, name: str) -> typing.Tuple[bytes, bytes]:
@@ -792,13 +695,14 @@ class ClaimExpirationPrefixRow(PrefixRow):
 
     @classmethod
     def unpack_key(cls, key: bytes) -> ClaimExpirationKey:
-        return ClaimExpirationKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return ClaimExpirationKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> ClaimExpirationValue:
-        name_len = int.from_bytes(data[20:22], byteorder='big')
-        name = data[22:22 + name_len].decode()
-        claim_id, = cls.value_struct.unpack(data[:20])
+        name_len = _u16_unpack_from(data, 20)[0]
+        name = _decoded_name(data[22:22 + name_len])
+        claim_id, = cls._value_unpack_from(data)
         return ClaimExpirationValue(claim_id, name)
 
     @classmethod
@@ -810,29 +714,25 @@ class ClaimTakeoverPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.claim_takeover.value
     value_struct = struct.Struct(b'>20sL')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         length_encoded_name
-    ]
+    )
 
     @classmethod
     def pack_key(cls, name: str):
-        return cls.prefix + length_encoded_name(name)
-
-    @classmethod
-    def pack_value(cls, claim_hash: bytes, takeover_height: int):
-        return super().pack_value(claim_hash, takeover_height)
+        return _name_key_head(cls.prefix, name)
 
     @classmethod
     def unpack_key(cls, key: bytes) -> ClaimTakeoverKey:
-        assert key[:1] == cls.prefix
-        name_len = int.from_bytes(key[1:3], byteorder='big')
-        name = key[3:3 + name_len].decode()
+        assert key[0] == cls._prefix_byte
+        name_len = _u16_unpack_from(key, 1)[0]
+        name = _decoded_name(key[3:3 + name_len])
         return ClaimTakeoverKey(name)
 
     @classmethod
     def unpack_value(cls, data: bytes) -> ClaimTakeoverValue:
-        return ClaimTakeoverValue(*super().unpack_value(data))
+        return ClaimTakeoverValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, name: str, claim_hash: bytes, takeover_height: int):
@@ -842,31 +742,29 @@ class ClaimTakeoverPrefixRow(PrefixRow):
 class PendingActivationPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.pending_activation.value
     key_struct = struct.Struct(b'>LBLH')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>L').pack,
         struct.Struct(b'>LB').pack,
         struct.Struct(b'>LBL').pack,
         struct.Struct(b'>LBLH').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, height: int, txo_type: int, tx_num: int, position: int):
-        return super().pack_key(height, txo_type, tx_num, position)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> PendingActivationKey:
-        return PendingActivationKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return PendingActivationKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def pack_value(cls, claim_hash: bytes, name: str) -> bytes:
-        return claim_hash + length_encoded_name(name)
+        encoded = _encoded_name(name)
+        return _fused_struct(f'>20sH{len(encoded)}s').pack(claim_hash, len(encoded), encoded)
 
     @classmethod
     def unpack_value(cls, data: bytes) -> PendingActivationValue:
         claim_hash = data[:20]
-        name_len = int.from_bytes(data[20:22], byteorder='big')
-        name = data[22:22 + name_len].decode()
+        name_len = _u16_unpack_from(data, 20)[0]
+        name = _decoded_name(data[22:22 + name_len])
         return PendingActivationValue(claim_hash, name)
 
     @classmethod
@@ -879,30 +777,28 @@ class ActivatedPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.activated_claim_and_support.value
     key_struct = struct.Struct(b'>BLH')
     value_struct = struct.Struct(b'>L20s')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>B').pack,
         struct.Struct(b'>BL').pack,
         struct.Struct(b'>BLH').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, txo_type: int, tx_num: int, position: int):
-        return super().pack_key(txo_type, tx_num, position)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> ActivationKey:
-        return ActivationKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return ActivationKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def pack_value(cls, height: int, claim_hash: bytes, name: str) -> bytes:
-        return cls.value_struct.pack(height, claim_hash) + length_encoded_name(name)
+        encoded = _encoded_name(name)
+        return _fused_struct(f'>L20sH{len(encoded)}s').pack(height, claim_hash, len(encoded), encoded)
 
     @classmethod
     def unpack_value(cls, data: bytes) -> ActivationValue:
-        height, claim_hash = cls.value_struct.unpack(data[:24])
-        name_len = int.from_bytes(data[24:26], byteorder='big')
-        name = data[26:26 + name_len].decode()
+        height, claim_hash = cls._value_unpack_from(data)
+        name_len = _u16_unpack_from(data, 24)[0]
+        name = _decoded_name(data[26:26 + name_len])
         return ActivationValue(height, claim_hash, name)
 
     @classmethod
@@ -918,8 +814,8 @@ def effective_amount_helper(struct_fmt):
         if not args:
             return length_encoded_name(name)
         if len(args) == 1:
-            return length_encoded_name(name) + packer(0xffffffffffffffff - args[0])
-        return length_encoded_name(name) + packer(0xffffffffffffffff - args[0], *args[1:])
+            return length_encoded_name(name) + packer(_invert_u64(args[0]))
+        return length_encoded_name(name) + packer(_invert_u64(args[0]), *args[1:])
 
     return wrapper
 
@@ -928,36 +824,32 @@ class BidOrderPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.bid_order.value
     key_struct = struct.Struct(b'>QLH')
     value_struct = struct.Struct(b'>20s')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         length_encoded_name,
         shortid_key_helper(b'>Q'),
         shortid_key_helper(b'>QL'),
         shortid_key_helper(b'>QLH'),
-    ]
+    )
     cache_size = 1024 * 1024 * 64
 
     @classmethod
     def pack_key(cls, name: str, effective_amount: int, tx_num: int, position: int):
-        return cls.prefix + length_encoded_name(name) + cls.key_struct.pack(
-                    0xffffffffffffffff - effective_amount, tx_num, position
+        return _name_key_head(cls.prefix, name) + _fused_struct(b'>QLH').pack(
+            _invert_u64(effective_amount), tx_num, position
         )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> BidOrderKey:
-        assert key[:1] == cls.prefix
-        name_len = int.from_bytes(key[1:3], byteorder='big')
-        name = key[3:3 + name_len].decode()
-        ones_comp_effective_amount, tx_num, position = cls.key_struct.unpack(key[3 + name_len:])
-        return BidOrderKey(name, 0xffffffffffffffff - ones_comp_effective_amount, tx_num, position)
+        assert key[0] == cls._prefix_byte
+        name_len = _u16_unpack_from(key, 1)[0]
+        name = _decoded_name(key[3:3 + name_len])
+        ones_comp_effective_amount, tx_num, position = cls._key_unpack_from(key, 3 + name_len)
+        return BidOrderKey(name, _invert_u64(ones_comp_effective_amount), tx_num, position)
 
     @classmethod
     def unpack_value(cls, data: bytes) -> BidOrderValue:
-        return BidOrderValue(*super().unpack_value(data))
-
-    @classmethod
-    def pack_value(cls, claim_hash: bytes) -> bytes:
-        return super().pack_value(claim_hash)
+        return BidOrderValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, name: str, effective_amount: int, tx_num: int, position: int, claim_hash: bytes):
@@ -968,18 +860,15 @@ class RepostPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.repost.value
     key_struct = struct.Struct(b'>20s')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, claim_hash: bytes):
-        return super().pack_key(claim_hash)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> RepostKey:
-        return RepostKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return RepostKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def pack_value(cls, reposted_claim_hash: bytes) -> bytes:
@@ -998,28 +887,21 @@ class RepostedPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.reposted_claim.value
     key_struct = struct.Struct(b'>20sLH')
     value_struct = struct.Struct(b'>20s')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack,
         struct.Struct(b'>20sL').pack,
         struct.Struct(b'>20sLH').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, reposted_claim_hash: bytes, tx_num: int, position: int):
-        return super().pack_key(reposted_claim_hash, tx_num, position)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> RepostedKey:
-        return RepostedKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, claim_hash: bytes) -> bytes:
-        return super().pack_value(claim_hash)
+        assert key[0] == cls._prefix_byte
+        return RepostedKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> RepostedValue:
-        return RepostedValue(*super().unpack_value(data))
+        return RepostedValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, reposted_claim_hash: bytes, tx_num: int, position: int, claim_hash: bytes):
@@ -1038,26 +920,19 @@ class RepostedCountPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.reposted_count.value
     key_struct = struct.Struct(b'>20s')
     value_struct = struct.Struct(b'>L')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack,
-    ]
-
-    @classmethod
-    def pack_key(cls, claim_hash: bytes):
-        return super().pack_key(claim_hash)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> RepostedCountKey:
-        return RepostedCountKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, reposted_count: int) -> bytes:
-        return super().pack_value(reposted_count)
+        assert key[0] == cls._prefix_byte
+        return RepostedCountKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> RepostedCountValue:
-        return RepostedCountValue(*super().unpack_value(data))
+        return RepostedCountValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, claim_hash: bytes, reposted_count: int):
@@ -1073,19 +948,16 @@ class UndoPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.undo.value
     key_struct = struct.Struct(b'>Q32s')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>Q').pack,
         struct.Struct(b'>Q32s').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, height: int, block_hash: bytes):
-        return super().pack_key(height, block_hash)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> UndoKey:
-        return UndoKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return UndoKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def pack_value(cls, undo_ops: bytes) -> bytes:
@@ -1105,26 +977,19 @@ class BlockHashPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>L')
     value_struct = struct.Struct(b'>32s')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>L').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, height: int) -> bytes:
-        return super().pack_key(height)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> BlockHashKey:
-        return BlockHashKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, block_hash: bytes) -> bytes:
-        return super().pack_value(block_hash)
+        assert key[0] == cls._prefix_byte
+        return BlockHashKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> BlockHashValue:
-        return BlockHashValue(*super().unpack_value(data))
+        return BlockHashValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, height: int, block_hash: bytes):
@@ -1136,26 +1001,19 @@ class BlockHeaderPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>L')
     value_struct = struct.Struct(b'>112s')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>L').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, height: int) -> bytes:
-        return super().pack_key(height)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> BlockHeaderKey:
-        return BlockHeaderKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, header: bytes) -> bytes:
-        return super().pack_value(header)
+        assert key[0] == cls._prefix_byte
+        return BlockHeaderKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> BlockHeaderValue:
-        return BlockHeaderValue(*super().unpack_value(data))
+        return BlockHeaderValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, height: int, header: bytes):
@@ -1167,27 +1025,19 @@ class TXNumPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>32s')
     value_struct = struct.Struct(b'>L')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>32s').pack
-    ]
+    )
     cache_size = 1024 * 1024 * 64
 
-    @classmethod
-    def pack_key(cls, tx_hash: bytes) -> bytes:
-        return super().pack_key(tx_hash)
-
     @classmethod
     def unpack_key(cls, tx_hash: bytes) -> TxNumKey:
         return TxNumKey(*super().unpack_key(tx_hash))
 
-    @classmethod
-    def pack_value(cls, tx_num: int) -> bytes:
-        return super().pack_value(tx_num)
-
     @classmethod
     def unpack_value(cls, data: bytes) -> TxNumValue:
-        return TxNumValue(*super().unpack_value(data))
+        return TxNumValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, tx_hash: bytes, tx_num: int):
@@ -1199,26 +1049,19 @@ class TxCountPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>L')
     value_struct = struct.Struct(b'>L')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>L').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, height: int) -> bytes:
-        return super().pack_key(height)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> TxCountKey:
-        return TxCountKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, tx_count: int) -> bytes:
-        return super().pack_value(tx_count)
+        assert key[0] == cls._prefix_byte
+        return TxCountKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> TxCountValue:
-        return TxCountValue(*super().unpack_value(data))
+        return TxCountValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, height: int, tx_count: int):
@@ -1230,28 +1073,21 @@ class TXHashPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>L')
     value_struct = struct.Struct(b'>32s')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>L').pack
-    ]
+    )
 
     cache_size = 1024 * 1024 * 64
 
-    @classmethod
-    def pack_key(cls, tx_num: int) -> bytes:
-        return super().pack_key(tx_num)
-
     @classmethod
     def unpack_key(cls, key: bytes) -> TxHashKey:
-        return TxHashKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, tx_hash: bytes) -> bytes:
-        return super().pack_value(tx_hash)
+        assert key[0] == cls._prefix_byte
+        return TxHashKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> TxHashValue:
-        return TxHashValue(*super().unpack_value(data))
+        return TxHashValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, tx_num: int, tx_hash: bytes):
@@ -1262,16 +1098,12 @@ class TXPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.tx.value
     key_struct = struct.Struct(b'>32s')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>32s').pack
-    ]
+    )
     cache_size = 1024 * 1024 * 64
 
-    @classmethod
-    def pack_key(cls, tx_hash: bytes) -> bytes:
-        return super().pack_key(tx_hash)
-
     @classmethod
     def unpack_key(cls, tx_hash: bytes) -> TxKey:
         return TxKey(*super().unpack_key(tx_hash))
@@ -1294,61 +1126,51 @@ class UTXOPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>11sLH')
     value_struct = struct.Struct(b'>Q')
     cache_size = 1024 * 1024 * 64
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>11s').pack,
         struct.Struct(b'>11sL').pack,
         struct.Struct(b'>11sLH').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, hashX: bytes, tx_num, nout: int):
-        return super().pack_key(hashX, tx_num, nout)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> UTXOKey:
-        return UTXOKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, amount: int) -> bytes:
-        return super().pack_value(amount)
+        assert key[0] == cls._prefix_byte
+        return UTXOKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> UTXOValue:
-        return UTXOValue(*cls.value_struct.unpack(data))
+        return UTXOValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, hashX: bytes, tx_num: int, nout: int, amount: int):
         return cls.pack_key(hashX, tx_num, nout), cls.pack_value(amount)
 
+    @classmethod
+    def sum_amounts(cls, raw_values: typing.Iterable[bytes]) -> int:
+        return _sum_packed_u64(raw_values)
+
 
 class HashXUTXOPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.hashx_utxo.value
     key_struct = struct.Struct(b'>4sLH')
     value_struct = struct.Struct(b'>11s')
     cache_size = 1024 * 1024 * 64
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>4s').pack,
         struct.Struct(b'>4sL').pack,
         struct.Struct(b'>4sLH').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, short_tx_hash: bytes, tx_num, nout: int):
-        return super().pack_key(short_tx_hash, tx_num, nout)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> HashXUTXOKey:
-        return HashXUTXOKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, hashX: bytes) -> bytes:
-        return super().pack_value(hashX)
+        assert key[0] == cls._prefix_byte
+        return HashXUTXOKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> HashXUTXOValue:
-        return HashXUTXOValue(*cls.value_struct.unpack(data))
+        return HashXUTXOValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, short_tx_hash: bytes, tx_num: int, nout: int, hashX: bytes):
@@ -1359,22 +1181,21 @@ class HashXHistoryPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.hashx_history.value
     key_struct = struct.Struct(b'>11sL')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>11s').pack,
         struct.Struct(b'>11sL').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, hashX: bytes, height: int):
-        return super().pack_key(hashX, height)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> HashXHistoryKey:
-        return HashXHistoryKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return HashXHistoryKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
-    def pack_value(cls, history: typing.List[int]) -> bytes:
+    def pack_value(cls, history: typing.Union[typing.List[int], array.array]) -> bytes:
+        if isinstance(history, array.array):
+            return history.tobytes()
         a = array.array('I')
         a.fromlist(history)
         return a.tobytes()
@@ -1385,6 +1206,14 @@ class HashXHistoryPrefixRow(PrefixRow):
         a.frombytes(data)
         return a
 
+    @classmethod
+    def unpack_values_batch(cls, raw_values: typing.Iterable[bytes]) -> array.array:
+        # decode a contiguous run of history rows in one frombytes call;
+        # for status hashing the per-row boundaries don't matter
+        a = array.array('I')
+        a.frombytes(b''.join(raw_values))
+        return a
+
     @classmethod
     def pack_item(cls, hashX: bytes, height: int, history: typing.List[int]):
         return cls.pack_key(hashX, height), cls.pack_value(history)
@@ -1394,35 +1223,28 @@ class TouchedOrDeletedPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.touched_or_deleted.value
     key_struct = struct.Struct(b'>L')
     value_struct = struct.Struct(b'>LL')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>L').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, height: int):
-        return super().pack_key(height)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> TouchedOrDeletedClaimKey:
-        return TouchedOrDeletedClaimKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return TouchedOrDeletedClaimKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def pack_value(cls, touched: typing.Set[bytes], deleted: typing.Set[bytes]) -> bytes:
-        assert True if not touched else all(len(item) == 20 for item in touched)
-        assert True if not deleted else all(len(item) == 20 for item in deleted)
-        return cls.value_struct.pack(len(touched), len(deleted)) + b''.join(sorted(touched)) + b''.join(sorted(deleted))
+        assert all(len(item) == 20 for item in touched)
+        assert all(len(item) == 20 for item in deleted)
+        return b''.join([cls._value_pack(len(touched), len(deleted)), *sorted(touched), *sorted(deleted)])
 
     @classmethod
     def unpack_value(cls, data: bytes) -> TouchedOrDeletedClaimValue:
-        touched_len, deleted_len = cls.value_struct.unpack(data[:8])
-        data = data[8:]
-        assert len(data) == 20 * (touched_len + deleted_len)
-        touched_bytes, deleted_bytes = data[:touched_len*20], data[touched_len*20:]
-        return TouchedOrDeletedClaimValue(
-            {touched_bytes[20*i:20*(i+1)] for i in range(touched_len)},
-            {deleted_bytes[20*i:20*(i+1)] for i in range(deleted_len)}
-        )
+        touched_len, deleted_len = cls._value_unpack_from(data)
+        assert len(data) == 8 + 20 * (touched_len + deleted_len)
+        split = 8 + touched_len * 20
+        return TouchedOrDeletedClaimValue(data[8:split], data[split:])
 
     @classmethod
     def pack_item(cls, height, touched, deleted):
@@ -1433,26 +1255,19 @@ class ChannelCountPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.channel_count.value
     key_struct = struct.Struct(b'>20s')
     value_struct = struct.Struct(b'>L')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, channel_hash: bytes):
-        return super().pack_key(channel_hash)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> ChannelCountKey:
-        return ChannelCountKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, count: int) -> bytes:
-        return super().pack_value(count)
+        assert key[0] == cls._prefix_byte
+        return ChannelCountKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> ChannelCountValue:
-        return ChannelCountValue(*super().unpack_value(data))
+        return ChannelCountValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, channel_hash, count):
@@ -1463,40 +1278,37 @@ class SupportAmountPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.support_amount.value
     key_struct = struct.Struct(b'>20s')
     value_struct = struct.Struct(b'>Q')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, claim_hash: bytes):
-        return super().pack_key(claim_hash)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> SupportAmountKey:
-        return SupportAmountKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, amount: int) -> bytes:
-        return super().pack_value(amount)
+        assert key[0] == cls._prefix_byte
+        return SupportAmountKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> SupportAmountValue:
-        return SupportAmountValue(*super().unpack_value(data))
+        return SupportAmountValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, claim_hash, amount):
         return cls.pack_key(claim_hash), cls.pack_value(amount)
 
+    @classmethod
+    def sum_amounts(cls, raw_values: typing.Iterable[bytes]) -> int:
+        return _sum_packed_u64(raw_values)
+
 
 class DBStatePrefixRow(PrefixRow):
     prefix = DB_PREFIXES.db_state.value
     value_struct = struct.Struct(b'>32sLL32sLLBBlllLL')
     key_struct = struct.Struct(b'')
 
-    key_part_lambdas = [
-        lambda: b''
-    ]
+    key_part_lambdas = (
+        None,
+    )
 
     @classmethod
     def pack_key(cls) -> bytes:
@@ -1514,7 +1326,7 @@ class DBStatePrefixRow(PrefixRow):
         bit_fields = 0
         bit_fields |= int(catching_up) << 0
         bit_fields |= int(index_address_statuses) << 1
-        return super().pack_value(
+        return cls._value_pack(
             genesis, height, tx_count, tip, utxo_flush_count,
             wall_time, bit_fields, db_version, hist_flush_count,
             comp_flush_count, comp_cursor, es_sync_height, last_indexed_address_statuses
@@ -1522,13 +1334,14 @@ class DBStatePrefixRow(PrefixRow):
 
     @classmethod
     def unpack_value(cls, data: bytes) -> DBState:
-        if len(data) == 94:
+        if len(data) != cls.value_struct.size:
             # TODO: delete this after making a new snapshot - 10/20/21
             # migrate in the es_sync_height if it doesnt exist
-            data += data[32:36]
-        if len(data) == 98:
-            data += data[32:36]
-        return DBState(*super().unpack_value(data))
+            if len(data) == 94:
+                data += data[32:36]
+            if len(data) == 98:
+                data += data[32:36]
+        return DBState(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, genesis: bytes, height: int, tx_count: int, tip: bytes, utxo_flush_count: int, wall_time: int,
@@ -1544,18 +1357,15 @@ class DBStatePrefixRow(PrefixRow):
 class BlockTxsPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.block_tx.value
     key_struct = struct.Struct(b'>L')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>L').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, height: int):
-        return super().pack_key(height)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> BlockTxsKey:
-        return BlockTxsKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return BlockTxsKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def pack_value(cls, tx_hashes: typing.List[bytes]) -> bytes:
@@ -1564,7 +1374,7 @@ class BlockTxsPrefixRow(PrefixRow):
 
     @classmethod
     def unpack_value(cls, data: bytes) -> BlockTxsValue:
-        return BlockTxsValue([data[i*32:(i+1)*32] for i in range(len(data) // 32)])
+        return BlockTxsValue(list(_hash_list_struct(32, len(data) // 32).unpack(data)))
 
     @classmethod
     def pack_item(cls, height, tx_hashes):
@@ -1574,17 +1384,9 @@ class BlockTxsPrefixRow(PrefixRow):
 class MempoolTxKey(NamedTuple):
     tx_hash: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(tx_hash={self.tx_hash[::-1].hex()})"
-
-
 class MempoolTxValue(NamedTuple):
     raw_tx: bytes
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(raw_tx={base64.b64encode(self.raw_tx).decode()})"
-
-
 class MempoolTXPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.mempool_tx.value
     key_struct = struct.Struct(b'>32s')
@@ -1592,14 +1394,10 @@ class MempoolTXPrefixRow(PrefixRow):
     MAX_TX_HASH = b'\xff' * 32
     MIN_TX_HASH = b'\x00' * 32
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>32s').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, tx_hash: bytes) -> bytes:
-        return super().pack_key(tx_hash)
+    )
 
     @classmethod
     def unpack_key(cls, tx_hash: bytes) -> MempoolTxKey:
@@ -1632,27 +1430,20 @@ class TrendingNotificationPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.trending_notifications.value
     key_struct = struct.Struct(b'>L20s')
     value_struct = struct.Struct(b'>QQ')
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>L').pack,
         struct.Struct(b'>L20s').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, height: int, claim_hash: bytes):
-        return super().pack_key(height, claim_hash)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> TrendingNotificationKey:
-        return TrendingNotificationKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, previous_amount: int, new_amount: int) -> bytes:
-        return super().pack_value(previous_amount, new_amount)
+        assert key[0] == cls._prefix_byte
+        return TrendingNotificationKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> TrendingNotificationValue:
-        return TrendingNotificationValue(*super().unpack_value(data))
+        return TrendingNotificationValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, height, claim_hash, previous_amount, new_amount):
@@ -1666,35 +1457,28 @@ class TouchedHashXKey(NamedTuple):
 class TouchedHashXValue(NamedTuple):
     touched_hashXs: typing.List[bytes]
 
-    def __str__(self):
-        return f"{self.__class__.__name__}(touched_hashXs=[{', '.join(map(lambda x: x.hex(), self.touched_hashXs))}])"
-
-
 class TouchedHashXPrefixRow(PrefixRow):
     prefix = DB_PREFIXES.touched_hashX.value
     key_struct = struct.Struct(b'>L')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>L').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, height: int):
-        return super().pack_key(height)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> TouchedHashXKey:
-        return TouchedHashXKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return TouchedHashXKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def pack_value(cls, touched: typing.List[bytes]) -> bytes:
-        assert all(map(lambda item: len(item) == 11, touched))
+        assert all(len(item) == 11 for item in touched)
         return b''.join(touched)
 
     @classmethod
     def unpack_value(cls, data: bytes) -> TouchedHashXValue:
-        return TouchedHashXValue([data[idx*11:(idx*11)+11] for idx in range(len(data) // 11)])
+        return TouchedHashXValue(list(_hash_list_struct(11, len(data) // 11).unpack(data)))
 
     @classmethod
     def pack_item(cls, height: int, touched: typing.List[bytes]):
@@ -1714,26 +1498,19 @@ class HashXStatusPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>20s')
     value_struct = struct.Struct(b'32s')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, hashX: bytes):
-        return super().pack_key(hashX)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> HashXStatusKey:
-        return HashXStatusKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, status: bytes) -> bytes:
-        return super().pack_value(status)
+        assert key[0] == cls._prefix_byte
+        return HashXStatusKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> HashXStatusValue:
-        return HashXStatusValue(*cls.value_struct.unpack(data))
+        return HashXStatusValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, hashX: bytes,  status: bytes):
@@ -1745,26 +1522,19 @@ class HashXMempoolStatusPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>20s')
     value_struct = struct.Struct(b'32s')
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, hashX: bytes):
-        return super().pack_key(hashX)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> HashXStatusKey:
-        return HashXStatusKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, status: bytes) -> bytes:
-        return super().pack_value(status)
+        assert key[0] == cls._prefix_byte
+        return HashXStatusKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> HashXStatusValue:
-        return HashXStatusValue(*cls.value_struct.unpack(data))
+        return HashXStatusValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, hashX: bytes,  status: bytes):
@@ -1785,27 +1555,24 @@ class EffectiveAmountPrefixRow(PrefixRow):
     key_struct = struct.Struct(b'>20s')
     value_struct = struct.Struct(b'>QQ')
     cache_size = 1024 * 1024 * 64
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, claim_hash: bytes):
-        return super().pack_key(claim_hash)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> EffectiveAmountKey:
-        return EffectiveAmountKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return EffectiveAmountKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def pack_value(cls, effective_amount: int, support_sum: int) -> bytes:
         assert effective_amount >= support_sum
-        return super().pack_value(effective_amount, support_sum)
+        return cls._value_pack(effective_amount, support_sum)
 
     @classmethod
     def unpack_value(cls, data: bytes) -> EffectiveAmountValue:
-        return EffectiveAmountValue(*cls.value_struct.unpack(data))
+        return EffectiveAmountValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, claim_hash: bytes,  effective_amount: int, support_sum: int):
@@ -1826,26 +1593,19 @@ class FutureEffectiveAmountPrefixRow(PrefixRow):
     value_struct = struct.Struct(b'>Q')
     cache_size = 1024 * 1024 * 64
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>20s').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, claim_hash: bytes):
-        return super().pack_key(claim_hash)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> FutureEffectiveAmountKey:
-        return FutureEffectiveAmountKey(*super().unpack_key(key))
-
-    @classmethod
-    def pack_value(cls, future_effective_amount: int) -> bytes:
-        return super().pack_value(future_effective_amount)
+        assert key[0] == cls._prefix_byte
+        return FutureEffectiveAmountKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def unpack_value(cls, data: bytes) -> FutureEffectiveAmountValue:
-        return FutureEffectiveAmountValue(*cls.value_struct.unpack(data))
+        return FutureEffectiveAmountValue(*cls._value_unpack(data))
 
     @classmethod
     def pack_item(cls, claim_hash: bytes,  future_effective_amount: int):
@@ -1866,26 +1626,23 @@ class HashXHistoryHasherPrefixRow(PrefixRow):
     value_struct = struct.Struct(b'>120s')
     cache_size = 1024 * 1024 * 64
 
-    key_part_lambdas = [
-        lambda: b'',
+    key_part_lambdas = (
+        None,
         struct.Struct(b'>11s').pack
-    ]
-
-    @classmethod
-    def pack_key(cls, hashX: bytes):
-        return super().pack_key(hashX)
+    )
 
     @classmethod
     def unpack_key(cls, key: bytes) -> HashXHistoryHasherKey:
-        return HashXHistoryHasherKey(*super().unpack_key(key))
+        assert key[0] == cls._prefix_byte
+        return HashXHistoryHasherKey(*cls._key_unpack_from(key, 1))
 
     @classmethod
     def pack_value(cls, hasher: ResumableSHA256) -> bytes:
-        return super().pack_value(hasher.get_state())
+        return cls._value_pack(hasher.get_state())
 
     @classmethod
     def unpack_value(cls, data: bytes) -> HashXHistoryHasherValue:
-        return HashXHistoryHasherValue(ResumableSHA256(*super().unpack_value(data)))
+        return HashXHistoryHasherValue(ResumableSHA256(*cls._value_unpack(data)))
 
     @classmethod
     def pack_item(cls, hashX: bytes,  hasher: ResumableSHA256):
@@ -1893,56 +1650,81 @@ class HashXHistoryHasherPrefixRow(PrefixRow):
 
 
 class PrefixDB(BasePrefixDB):
+    _ROW_CLASSES = (
+        ('claim_to_support', ClaimToSupportPrefixRow),
+        ('support_to_claim', SupportToClaimPrefixRow),
+        ('claim_to_txo', ClaimToTXOPrefixRow),
+        ('txo_to_claim', TXOToClaimPrefixRow),
+        ('claim_to_channel', ClaimToChannelPrefixRow),
+        ('channel_to_claim', ChannelToClaimPrefixRow),
+        ('claim_short_id', ClaimShortIDPrefixRow),
+        ('claim_expiration', ClaimExpirationPrefixRow),
+        ('claim_takeover', ClaimTakeoverPrefixRow),
+        ('pending_activation', PendingActivationPrefixRow),
+        ('activated', ActivatedPrefixRow),
+        ('active_amount', ActiveAmountPrefixRow),
+        ('bid_order', BidOrderPrefixRow),
+        ('repost', RepostPrefixRow),
+        ('reposted_claim', RepostedPrefixRow),
+        ('reposted_count', RepostedCountPrefixRow),
+        ('undo', UndoPrefixRow),
+        ('utxo', UTXOPrefixRow),
+        ('hashX_utxo', HashXUTXOPrefixRow),
+        ('hashX_history', HashXHistoryPrefixRow),
+        ('block_hash', BlockHashPrefixRow),
+        ('tx_count', TxCountPrefixRow),
+        ('tx_hash', TXHashPrefixRow),
+        ('tx_num', TXNumPrefixRow),
+        ('tx', TXPrefixRow),
+        ('header', BlockHeaderPrefixRow),
+        ('touched_or_deleted', TouchedOrDeletedPrefixRow),
+        ('channel_count', ChannelCountPrefixRow),
+        ('db_state', DBStatePrefixRow),
+        ('support_amount', SupportAmountPrefixRow),
+        ('block_txs', BlockTxsPrefixRow),
+        ('mempool_tx', MempoolTXPrefixRow),
+        ('trending_notification', TrendingNotificationPrefixRow),
+        ('touched_hashX', TouchedHashXPrefixRow),
+        ('hashX_status', HashXStatusPrefixRow),
+        ('hashX_mempool_status', HashXMempoolStatusPrefixRow),
+        ('effective_amount', EffectiveAmountPrefixRow),
+        ('future_effective_amount', FutureEffectiveAmountPrefixRow),
+        ('hashX_history_hasher', HashXHistoryHasherPrefixRow),
+    )
+
     def __init__(self, path: str, reorg_limit: int = 200, max_open_files: int = 64,
                  secondary_path: str = '', unsafe_prefixes: Optional[typing.Set[bytes]] = None,
                  enforce_integrity: bool = True):
         super().__init__(path, max_open_files=max_open_files, secondary_path=secondary_path,
                          max_undo_depth=reorg_limit, unsafe_prefixes=unsafe_prefixes,
                          enforce_integrity=enforce_integrity)
-        db = self._db
-        self.claim_to_support = ClaimToSupportPrefixRow(db, self._op_stack)
-        self.support_to_claim = SupportToClaimPrefixRow(db, self._op_stack)
-        self.claim_to_txo = ClaimToTXOPrefixRow(db, self._op_stack)
-        self.txo_to_claim = TXOToClaimPrefixRow(db, self._op_stack)
-        self.claim_to_channel = ClaimToChannelPrefixRow(db, self._op_stack)
-        self.channel_to_claim = ChannelToClaimPrefixRow(db, self._op_stack)
-        self.claim_short_id = ClaimShortIDPrefixRow(db, self._op_stack)
-        self.claim_expiration = ClaimExpirationPrefixRow(db, self._op_stack)
-        self.claim_takeover = ClaimTakeoverPrefixRow(db, self._op_stack)
-        self.pending_activation = PendingActivationPrefixRow(db, self._op_stack)
-        self.activated = ActivatedPrefixRow(db, self._op_stack)
-        self.active_amount = ActiveAmountPrefixRow(db, self._op_stack)
-        self.bid_order = BidOrderPrefixRow(db, self._op_stack)
-        self.repost = RepostPrefixRow(db, self._op_stack)
-        self.reposted_claim = RepostedPrefixRow(db, self._op_stack)
-        self.reposted_count = RepostedCountPrefixRow(db, self._op_stack)
-        self.undo = UndoPrefixRow(db, self._op_stack)
-        self.utxo = UTXOPrefixRow(db, self._op_stack)
-        self.hashX_utxo = HashXUTXOPrefixRow(db, self._op_stack)
-        self.hashX_history = HashXHistoryPrefixRow(db, self._op_stack)
-        self.block_hash = BlockHashPrefixRow(db, self._op_stack)
-        self.tx_count = TxCountPrefixRow(db, self._op_stack)
-        self.tx_hash = TXHashPrefixRow(db, self._op_stack)
-        self.tx_num = TXNumPrefixRow(db, self._op_stack)
-        self.tx = TXPrefixRow(db, self._op_stack)
-        self.header = BlockHeaderPrefixRow(db, self._op_stack)
-        self.touched_or_deleted = TouchedOrDeletedPrefixRow(db, self._op_stack)
-        self.channel_count = ChannelCountPrefixRow(db, self._op_stack)
-        self.db_state = DBStatePrefixRow(db, self._op_stack)
-        self.support_amount = SupportAmountPrefixRow(db, self._op_stack)
-        self.block_txs = BlockTxsPrefixRow(db, self._op_stack)
-        self.mempool_tx = MempoolTXPrefixRow(db, self._op_stack)
-        self.trending_notification = TrendingNotificationPrefixRow(db, self._op_stack)
-        self.touched_hashX = TouchedHashXPrefixRow(db, self._op_stack)
-        self.hashX_status = HashXStatusPrefixRow(db, self._op_stack)
-        self.hashX_mempool_status = HashXMempoolStatusPrefixRow(db, self._op_stack)
-        self.effective_amount = EffectiveAmountPrefixRow(db, self._op_stack)
-        self.future_effective_amount = FutureEffectiveAmountPrefixRow(db, self._op_stack)
-        self.hashX_history_hasher = HashXHistoryHasherPrefixRow(db, self._op_stack)
+        db, op_stack = self._db, self._op_stack
+        for attr, row_class in self._ROW_CLASSES:
+            setattr(self, attr, row_class(db, op_stack))
+
+
+# dispatch table indexed by the prefix byte; avoids a bytes slice and
+# dict lookup per decoded item
+_ROW_UNPACK_TABLE = [None] * 256
+for _prefix, _row_type in ROW_TYPES.items():
+    _ROW_UNPACK_TABLE[_prefix[0]] = _row_type.unpack_item
 
 
 def auto_decode_item(key: bytes, value: bytes) -> Union[Tuple[NamedTuple, NamedTuple], Tuple[bytes, bytes]]:
-    try:
-        return ROW_TYPES[key[:1]].unpack_item(key, value)
-    except KeyError:
+    unpack_item = _ROW_UNPACK_TABLE[key[0]]
+    if unpack_item is None:
         return key, value
+    return unpack_item(key, value)
+
+
+def auto_decode_items(pairs: typing.Iterable[Tuple[bytes, bytes]]) -> typing.Iterator[
+        Union[Tuple[NamedTuple, NamedTuple], Tuple[bytes, bytes]]]:
+    # scans are prefix-clustered, so resolve the decoder once per run of
+    # same-prefix keys instead of per row
+    for prefix_byte, group in groupby(pairs, key=lambda kv: kv[0][0]):
+        unpack_item = _ROW_UNPACK_TABLE[prefix_byte]
+        if unpack_item is None:
+            yield from group
+        else:
+            for key, value in group:
+                yield unpack_item(key, value)
@@ -1 +1,17 @@
+import os
+import logging
+from importlib.util import find_spec
+
+# prefer the C++ protobuf runtime when the extension is built; it is much
+# faster than the pure python reflection backend used as the default. The
+# backend is read once when google.protobuf.internal.api_implementation is
+# first imported, so probe for the extension without importing it and set
+# the env var before anything touches protobuf
+if 'PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION' not in os.environ:
+    if find_spec('google.protobuf.pyext._message') is not None:
+        os.environ['PROTOCOL_BUFFERS_PYTHON_IMPLEMENTATION'] = 'cpp'
+
+from google.protobuf.internal import api_implementation
 from .claim import Claim
+
+logging.getLogger(__name__).debug("using '%s' protobuf backend", api_implementation.Type())
@@ -1,11 +1,14 @@
-import json
 import logging
+import re
 import os.path
 import hashlib
+import mmap
+import stat
 from typing import Tuple, List
 from string import ascii_letters
+import ujson
 from decimal import Decimal, ROUND_UP
-from google.protobuf.json_format import MessageToDict
+from functools import lru_cache
 
 from hub.schema.base58 import Base58, b58_encode
 from hub.error import MissingPublishedFileError, EmptyPublishedFileError
@@ -26,24 +29,93 @@ log = logging.getLogger(__name__)
 CENT = 1000000
 COIN = 100*CENT
 
+DEWIES = Decimal(COIN)
+SATOSHIES = Decimal(COIN)
+PENNIES = Decimal('100.0')
+PENNY = Decimal('0.01')
+GPS_PRECISION = Decimal('10000000')
+
+
+@lru_cache(maxsize=4096)
+def _amount_to_decimal(amount: int, divisor: Decimal) -> Decimal:
+    return Decimal(amount) / divisor
+
+
+@lru_cache(maxsize=65536)
+def _cached_hex(data: bytes) -> str:
+    return data.hex()
+
+
+@lru_cache(maxsize=4096)
+def claim_hash_to_id(claim_hash: bytes) -> str:
+    return claim_hash[::-1].hex()
+
+
+@lru_cache(maxsize=4096)
+def claim_id_to_hash(claim_id: str) -> bytes:
+    return bytes.fromhex(claim_id)[::-1]
+
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def _hash_file(f, size: int) -> bytes:
+    if hasattr(os, 'posix_fadvise'):
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+    try:
+        return _hash_file_inner(f, size)
+    finally:
+        if hasattr(os, 'posix_fadvise'):
+            # hashed data will not be re-read; give the page cache back
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def _hash_file_inner(f, size: int) -> bytes:
+    if size >= HASH_CHUNK_SIZE:
+        # for large files hash straight out of the page cache rather than
+        # copying through read buffers
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mapped.madvise(mmap.MADV_SEQUENTIAL)
+            sha384 = hashlib.sha384()
+            with memoryview(mapped) as view:
+                for offset in range(0, size, HASH_CHUNK_SIZE):
+                    sha384.update(view[offset:offset + HASH_CHUNK_SIZE])
+            return sha384.digest()
+    # the file fits in a single chunk; one read is cheaper than any buffering
+    return hashlib.sha384(f.read()).digest()
+
 
 def calculate_sha384_file_hash(file_path):
-    sha384 = hashlib.sha384()
-    with open(file_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(128 * sha384.block_size), b''):
-            sha384.update(chunk)
-    return sha384.digest()
+    with open(file_path, 'rb', buffering=0) as f:
+        return _hash_file(f, os.fstat(f.fileno()).st_size)
 
 
+# the enum tables are static, so cache the protobuf reflection lookups
+_country_name = lru_cache(maxsize=None)(LocationMessage.Country.Name)
+_country_value = lru_cache(maxsize=None)(LocationMessage.Country.Value)
+_language_name = lru_cache(maxsize=None)(LanguageMessage.Language.Name)
+_language_value = lru_cache(maxsize=None)(LanguageMessage.Language.Value)
+_script_name = lru_cache(maxsize=None)(LanguageMessage.Script.Name)
+_script_value = lru_cache(maxsize=None)(LanguageMessage.Script.Value)
+_currency_name = lru_cache(maxsize=None)(FeeMessage.Currency.Name)
+# bulk imports see the same tags over and over across claims
+_normalize_tag = lru_cache(maxsize=8192)(normalize_tag)
+
+_LANGTAG_RE = re.compile(r'^([A-Za-z]{2,3})(?:-([A-Za-z]{4}))?(?:-([A-Za-z]{2}|\d{3}))?$')
+
+
+@lru_cache(maxsize=None)
 def country_int_to_str(country: int) -> str:
-    r = LocationMessage.Country.Name(country)
+    r = _country_name(country)
     return r[1:] if r.startswith('R') else r
 
 
+@lru_cache(maxsize=None)
 def country_str_to_int(country: str) -> int:
     if len(country) == 3:
         country = 'R' + country
-    return LocationMessage.Country.Value(country)
+    return _country_value(country)
 
 
 class Dimmensional(Metadata):
@@ -141,12 +213,18 @@ class Source(Metadata):
         if file_path is not None:
             self.name = os.path.basename(file_path)
             self.media_type, stream_type = guess_media_type(file_path)
-            if not os.path.isfile(file_path):
+            try:
+                f = open(file_path, 'rb', buffering=0)
+            except (FileNotFoundError, IsADirectoryError):
                 raise MissingPublishedFileError(file_path)
-            self.size = os.path.getsize(file_path)
-            if self.size == 0:
-                raise EmptyPublishedFileError(file_path)
-            self.file_hash_bytes = calculate_sha384_file_hash(file_path)
+            with f:
+                file_stat = os.fstat(f.fileno())
+                if not stat.S_ISREG(file_stat.st_mode):
+                    raise MissingPublishedFileError(file_path)
+                if file_stat.st_size == 0:
+                    raise EmptyPublishedFileError(file_path)
+                self.size = file_stat.st_size
+                self.file_hash_bytes = _hash_file(f, file_stat.st_size)
             return stream_type
 
     @property
@@ -175,7 +253,7 @@ class Source(Metadata):
 
     @property
     def file_hash(self) -> str:
-        return self.message.hash.hex()
+        return _cached_hex(self.message.hash)
 
     @file_hash.setter
     def file_hash(self, file_hash: str):
@@ -191,7 +269,7 @@ class Source(Metadata):
 
     @property
     def sd_hash(self) -> str:
-        return self.message.sd_hash.hex()
+        return _cached_hex(self.message.sd_hash)
 
     @sd_hash.setter
     def sd_hash(self, sd_hash: str):
@@ -207,7 +285,7 @@ class Source(Metadata):
 
     @property
     def bt_infohash(self) -> str:
-        return self.message.bt_infohash.hex()
+        return _cached_hex(self.message.bt_infohash)
 
     @bt_infohash.setter
     def bt_infohash(self, bt_infohash: str):
@@ -215,7 +293,7 @@ class Source(Metadata):
 
     @property
     def bt_infohash_bytes(self) -> bytes:
-        return self.message.bt_infohash.decode()
+        return self.message.bt_infohash
 
     @bt_infohash_bytes.setter
     def bt_infohash_bytes(self, bt_infohash: bytes):
@@ -252,7 +330,7 @@ class Fee(Metadata):
     @property
     def currency(self) -> str:
         if self.message.currency:
-            return FeeMessage.Currency.Name(self.message.currency)
+            return _currency_name(self.message.currency)
 
     @property
     def address(self) -> str:
@@ -280,17 +358,17 @@ class Fee(Metadata):
         if self.currency == 'USD':
             return self.usd
 
-    DEWIES = Decimal(COIN)
+    DEWIES = DEWIES
 
     @property
     def lbc(self) -> Decimal:
         if self.message.currency != FeeMessage.LBC:
             raise ValueError('LBC can only be returned for LBC fees.')
-        return Decimal(self.message.amount / self.DEWIES)
+        return _amount_to_decimal(self.message.amount, DEWIES)
 
     @lbc.setter
     def lbc(self, amount: Decimal):
-        self.dewies = int(amount * self.DEWIES)
+        self.dewies = int(amount * DEWIES)
 
     @property
     def dewies(self) -> int:
@@ -303,17 +381,17 @@ class Fee(Metadata):
         self.message.amount = amount
         self.message.currency = FeeMessage.LBC
 
-    SATOSHIES = Decimal(COIN)
+    SATOSHIES = SATOSHIES
 
     @property
     def btc(self) -> Decimal:
         if self.message.currency != FeeMessage.BTC:
             raise ValueError('BTC can only be returned for BTC fees.')
-        return Decimal(self.message.amount / self.SATOSHIES)
+        return _amount_to_decimal(self.message.amount, SATOSHIES)
 
     @btc.setter
     def btc(self, amount: Decimal):
-        self.satoshis = int(amount * self.SATOSHIES)
+        self.satoshis = int(amount * SATOSHIES)
 
     @property
     def satoshis(self) -> int:
@@ -326,18 +404,18 @@ class Fee(Metadata):
         self.message.amount = amount
         self.message.currency = FeeMessage.BTC
 
-    PENNIES = Decimal('100.0')
-    PENNY = Decimal('0.01')
+    PENNIES = PENNIES
+    PENNY = PENNY
 
     @property
     def usd(self) -> Decimal:
         if self.message.currency != FeeMessage.USD:
             raise ValueError('USD can only be returned for USD fees.')
-        return Decimal(self.message.amount / self.PENNIES)
+        return _amount_to_decimal(self.message.amount, PENNIES)
 
     @usd.setter
     def usd(self, amount: Decimal):
-        self.pennies = int(amount.quantize(self.PENNY, ROUND_UP) * self.PENNIES)
+        self.pennies = int(amount.quantize(PENNY, ROUND_UP) * PENNIES)
 
     @property
     def pennies(self) -> int:
@@ -357,11 +435,11 @@ class ClaimReference(Metadata):
 
     @property
     def claim_id(self) -> str:
-        return self.claim_hash[::-1].hex()
+        return claim_hash_to_id(self.claim_hash)
 
     @claim_id.setter
     def claim_id(self, claim_id: str):
-        self.claim_hash = bytes.fromhex(claim_id)[::-1]
+        self.claim_hash = claim_id_to_hash(claim_id)
 
     @property
     def claim_hash(self) -> bytes:
@@ -406,33 +484,37 @@ class Language(Metadata):
 
     @langtag.setter
     def langtag(self, langtag: str):
-        parts = langtag.split('-')
-        self.language = parts.pop(0)
-        if parts and len(parts[0]) == 4:
-            self.script = parts.pop(0)
-        if parts and len(parts[0]) == 2 and parts[0].isalpha():
-            self.region = parts.pop(0)
-        if parts and len(parts[0]) == 3 and parts[0].isdigit():
-            self.region = parts.pop(0)
-        assert not parts, f"Failed to parse language tag: {langtag}"
+        match = _LANGTAG_RE.match(langtag)
+        if not match:
+            # surface a bad language token as the same ValueError the enum
+            # lookup raises; anything left over is a malformed tag
+            _language_value(langtag.split('-')[0])
+            raise AssertionError(f"Failed to parse language tag: {langtag}")
+        language, script, region = match.groups()
+        parsed = LanguageMessage(language=_language_value(language))
+        if script:
+            parsed.script = _script_value(script)
+        if region:
+            parsed.region = country_str_to_int(region)
+        self.message.MergeFrom(parsed)
 
     @property
     def language(self) -> str:
         if self.message.language:
-            return LanguageMessage.Language.Name(self.message.language)
+            return _language_name(self.message.language)
 
     @language.setter
     def language(self, language: str):
-        self.message.language = LanguageMessage.Language.Value(language)
+        self.message.language = _language_value(language)
 
     @property
     def script(self) -> str:
         if self.message.script:
-            return LanguageMessage.Script.Name(self.message.script)
+            return _script_name(self.message.script)
 
     @script.setter
     def script(self, script: str):
-        self.message.script = LanguageMessage.Script.Value(script)
+        self.message.script = _script_value(script)
 
     @property
     def region(self) -> str:
@@ -457,54 +539,72 @@ class Location(Metadata):
     __slots__ = ()
 
     def from_value(self, value):
-        if isinstance(value, str) and value.startswith('{'):
-            value = json.loads(value)
-
         if isinstance(value, dict):
-            for key, val in value.items():
-                setattr(self, key, val)
-
+            self.from_dict(value)
         elif isinstance(value, str):
-            parts = value.split(':')
-            if len(parts) > 2 or (parts[0] and parts[0][0] in ascii_letters):
-                country = parts and parts.pop(0)
-                if country:
-                    self.country = country
-                state = parts and parts.pop(0)
-                if state:
-                    self.state = state
-                city = parts and parts.pop(0)
-                if city:
-                    self.city = city
-                code = parts and parts.pop(0)
-                if code:
-                    self.code = code
-            latitude = parts and parts.pop(0)
-            if latitude:
-                self.latitude = latitude
-            longitude = parts and parts.pop(0)
-            if longitude:
-                self.longitude = longitude
-
+            if value.startswith('{'):
+                self.from_dict(ujson.loads(value))
+            else:
+                self.from_str(value)
         else:
             raise ValueError(f'Could not parse country value: {value}')
 
+    def from_dict(self, value: dict):
+        message = self.message
+        for key, val in value.items():
+            if key in ('state', 'city', 'code'):
+                # plain string fields can be written straight to the message
+                setattr(message, key, val)
+            else:
+                setattr(self, key, val)
+
+    def from_str(self, value: str):
+        parts = value.split(':')
+        if len(parts) > 2 or (parts[0] and parts[0][0] in ascii_letters):
+            country = parts and parts.pop(0)
+            if country:
+                self.country = country
+            state = parts and parts.pop(0)
+            if state:
+                self.state = state
+            city = parts and parts.pop(0)
+            if city:
+                self.city = city
+            code = parts and parts.pop(0)
+            if code:
+                self.code = code
+        latitude = parts and parts.pop(0)
+        if latitude:
+            self.latitude = latitude
+        longitude = parts and parts.pop(0)
+        if longitude:
+            self.longitude = longitude
+
     def to_dict(self):
-        d = MessageToDict(self.message)
-        if self.message.longitude:
-            d['longitude'] = self.longitude
-        if self.message.latitude:
+        d = {}
+        message = self.message
+        if message.country:
+            d['country'] = self.country
+        if message.state:
+            d['state'] = message.state
+        if message.city:
+            d['city'] = message.city
+        if message.code:
+            d['code'] = message.code
+        if message.latitude:
             d['latitude'] = self.latitude
+        if message.longitude:
+            d['longitude'] = self.longitude
         return d
 
     @property
     def country(self) -> str:
         if self.message.country:
-            return LocationMessage.Country.Name(self.message.country)
+            return _country_name(self.message.country)
 
     @country.setter
     def country(self, country: str):
-        self.message.country = LocationMessage.Country.Value(country)
+        self.message.country = _country_value(country)
 
     @property
     def state(self) -> str:
@@ -530,29 +630,29 @@ class Location(Metadata):
     def code(self, code: str):
         self.message.code = code
 
-    GPS_PRECISION = Decimal('10000000')
+    GPS_PRECISION = GPS_PRECISION
 
     @property
     def latitude(self) -> str:
         if self.message.latitude:
-            return str(Decimal(self.message.latitude) / self.GPS_PRECISION)
+            return str(Decimal(self.message.latitude) / GPS_PRECISION)
 
     @latitude.setter
     def latitude(self, latitude: str):
         latitude = Decimal(latitude)
         assert -90 <= latitude <= 90, "Latitude must be between -90 and 90 degrees."
-        self.message.latitude = int(latitude * self.GPS_PRECISION)
+        self.message.latitude = int(latitude * GPS_PRECISION)
 
     @property
     def longitude(self) -> str:
         if self.message.longitude:
-            return str(Decimal(self.message.longitude) / self.GPS_PRECISION)
+            return str(Decimal(self.message.longitude) / GPS_PRECISION)
 
     @longitude.setter
     def longitude(self, longitude: str):
         longitude = Decimal(longitude)
         assert -180 <= longitude <= 180, "Longitude must be between -180 and 180 degrees."
-        self.message.longitude = int(longitude * self.GPS_PRECISION)
+        self.message.longitude = int(longitude * GPS_PRECISION)
 
 
 class LocationList(BaseMessageList[Location]):
@@ -568,6 +668,6 @@ class TagList(BaseMessageList[str]):
     item_class = str
 
     def append(self, tag: str):
-        tag = normalize_tag(tag)
+        tag = _normalize_tag(tag)
         if tag and tag not in self.message:
             self.message.append(tag)
@@ -1,8 +1,10 @@
+import array
 import unittest
 import tempfile
 import shutil
+from hub.db import prefixes
 from hub.db.revertable import RevertableOpStack, RevertableDelete, RevertablePut, OpStackIntegrity
-from hub.db.prefixes import ClaimToTXOPrefixRow, PrefixDB
+from hub.db.prefixes import ClaimToTXOPrefixRow, PrefixDB, ROW_TYPES, auto_decode_item, auto_decode_items
 
 
 class TestRevertableOpStack(unittest.TestCase):
@@ -238,3 +240,154 @@ class TestRevertablePrefixDB(unittest.TestCase):
             self.assertEqual(200000, get_active_amount_as_of_height(claim_hash, 201))
             self.assertEqual(100000, get_active_amount_as_of_height(claim_hash, 200))
             self.assertEqual(0, get_active_amount_as_of_height(claim_hash, 199))
+
+
+CLAIM_HASH = b'\x11' * 20
+TX_HASH = b'\x22' * 32
+HASHX = b'\x33' * 11
+SHORT_HASHX = b'\x44' * 4
+HEADER = b'\x55' * 112
+
+# (row class, key args, value args[, expected unpacked value when it is not
+# just a tuple of the value args])
+ROW_SAMPLES = [
+    (prefixes.ClaimToSupportPrefixRow, (CLAIM_HASH, 1, 2), (500,)),
+    (prefixes.SupportToClaimPrefixRow, (1, 2), (CLAIM_HASH,)),
+    (prefixes.ClaimToTXOPrefixRow, (CLAIM_HASH,), (1, 2, 3, 4, 5, True, 'derp')),
+    (prefixes.TXOToClaimPrefixRow, (1, 2), (CLAIM_HASH, 'derp')),
+    (prefixes.ClaimToChannelPrefixRow, (CLAIM_HASH, 1, 2), (CLAIM_HASH,)),
+    (prefixes.ChannelToClaimPrefixRow, (CLAIM_HASH, 'derp', 1, 2), (CLAIM_HASH,)),
+    (prefixes.ClaimShortIDPrefixRow, ('derp', 'abcd', 1, 2), (3, 4)),
+    (prefixes.ClaimExpirationPrefixRow, (1, 2, 3), (CLAIM_HASH, 'derp')),
+    (prefixes.ClaimTakeoverPrefixRow, ('derp',), (CLAIM_HASH, 3)),
+    (prefixes.PendingActivationPrefixRow, (1, 2, 3, 4), (CLAIM_HASH, 'derp')),
+    (prefixes.ActivatedPrefixRow, (1, 2, 3), (5, CLAIM_HASH, 'derp')),
+    (prefixes.ActiveAmountPrefixRow, (CLAIM_HASH, 1, 5, 6, 7), (100,)),
+    (prefixes.BidOrderPrefixRow, ('derp', 123, 4, 5), (CLAIM_HASH,)),
+    (prefixes.RepostPrefixRow, (CLAIM_HASH,), (CLAIM_HASH,)),
+    (prefixes.RepostedPrefixRow, (CLAIM_HASH, 1, 2), (CLAIM_HASH,)),
+    (prefixes.RepostedCountPrefixRow, (CLAIM_HASH,), (9,)),
+    (prefixes.UndoPrefixRow, (5, TX_HASH), (b'undo ops',), b'undo ops'),
+    (prefixes.UTXOPrefixRow, (HASHX, 1, 2), (500,)),
+    (prefixes.HashXUTXOPrefixRow, (SHORT_HASHX, 1, 2), (HASHX,)),
+    (prefixes.HashXHistoryPrefixRow, (HASHX, 4), ([1, 2, 3],), array.array('I', [1, 2, 3])),
+    (prefixes.BlockHashPrefixRow, (5,), (TX_HASH,)),
+    (prefixes.BlockHeaderPrefixRow, (5,), (HEADER,)),
+    (prefixes.TXNumPrefixRow, (TX_HASH,), (7,)),
+    (prefixes.TxCountPrefixRow, (5,), (7,)),
+    (prefixes.TXHashPrefixRow, (5,), (TX_HASH,)),
+    (prefixes.TXPrefixRow, (TX_HASH,), (b'raw tx',)),
+    (prefixes.BlockTxsPrefixRow, (5,), ([TX_HASH, b'\x66' * 32],)),
+    (prefixes.TouchedOrDeletedPrefixRow, (5,), ({CLAIM_HASH}, set()), (CLAIM_HASH, b'')),
+    (prefixes.ChannelCountPrefixRow, (CLAIM_HASH,), (7,)),
+    (prefixes.SupportAmountPrefixRow, (CLAIM_HASH,), (7,)),
+    (prefixes.MempoolTXPrefixRow, (TX_HASH,), (b'raw tx',)),
+    (prefixes.TrendingNotificationPrefixRow, (5, CLAIM_HASH), (1, 2)),
+    (prefixes.TouchedHashXPrefixRow, (5,), ([HASHX, b'\x77' * 11],)),
+    (prefixes.HashXStatusPrefixRow, (CLAIM_HASH,), (TX_HASH,)),
+    (prefixes.HashXMempoolStatusPrefixRow, (CLAIM_HASH,), (TX_HASH,)),
+    (prefixes.EffectiveAmountPrefixRow, (CLAIM_HASH,), (10, 4)),
+    (prefixes.FutureEffectiveAmountPrefixRow, (CLAIM_HASH,), (7,)),
+]
+
+
+class TestPrefixRowSerialization(unittest.TestCase):
+    def assert_round_trip(self, row, key_args, value_args, expected_value=None):
+        key = row.pack_key(*key_args)
+        self.assertEqual(row.prefix, key[:1])
+        self.assertEqual(tuple(key_args), tuple(row.unpack_key(key)))
+        unpacked = row.unpack_value(row.pack_value(*value_args))
+        if expected_value is None:
+            expected_value = tuple(value_args)
+        if isinstance(expected_value, tuple):
+            unpacked = tuple(unpacked)
+        self.assertEqual(expected_value, unpacked)
+
+    def test_pack_unpack_round_trip(self):
+        for sample in ROW_SAMPLES:
+            with self.subTest(row=sample[0].__name__):
+                self.assert_round_trip(*sample)
+
+    def test_sample_coverage(self):
+        # every registered row type is exercised above or by a dedicated test below
+        covered = {sample[0].prefix for sample in ROW_SAMPLES}
+        covered.add(prefixes.DBStatePrefixRow.prefix)
+        covered.add(prefixes.HashXHistoryHasherPrefixRow.prefix)
+        self.assertEqual(set(ROW_TYPES), covered)
+
+    def test_variable_length_keys(self):
+        for name in ('a', 'derp', 'a' * 255):
+            for claim_id in ('f', 'deadbeef', '0' * 39):
+                key = prefixes.ClaimShortIDPrefixRow.pack_key(name, claim_id, 1, 2)
+                self.assertEqual((name, claim_id, 1, 2), tuple(prefixes.ClaimShortIDPrefixRow.unpack_key(key)))
+        # bid order keys store the ones complement of the effective amount so
+        # that higher bids sort first; the inversion must round trip
+        high = prefixes.BidOrderPrefixRow.pack_key('derp', 2000000, 1, 0)
+        low = prefixes.BidOrderPrefixRow.pack_key('derp', 1000000, 1, 0)
+        self.assertLess(high, low)
+        self.assertEqual(2000000, prefixes.BidOrderPrefixRow.unpack_key(high).effective_amount)
+        self.assertEqual(('derp', 1000000, 1, 0), tuple(prefixes.BidOrderPrefixRow.unpack_key(low)))
+
+    def test_variable_length_values(self):
+        for name in ('', 'derp', '系統' * 50):
+            unpacked = ClaimToTXOPrefixRow.unpack_value(ClaimToTXOPrefixRow.pack_value(1, 2, 3, 4, 5, False, name))
+            self.assertEqual(name, unpacked.name)
+            self.assertEqual((1, 2, 3, 4, 5), tuple(unpacked)[:5])
+
+    def test_touched_or_deleted_value(self):
+        row = prefixes.TouchedOrDeletedPrefixRow
+        touched = {b'\x01' * 20, b'\x02' * 20}
+        deleted = {b'\x03' * 20}
+        value = row.unpack_value(row.pack_value(touched, deleted))
+        self.assertEqual(frozenset(touched), value.touched_claims)
+        self.assertEqual(frozenset(deleted), value.deleted_claims)
+        empty = row.unpack_value(row.pack_value(set(), set()))
+        self.assertEqual(frozenset(), empty.touched_claims)
+        self.assertEqual(frozenset(), empty.deleted_claims)
+        # the packed bytes don't depend on set iteration order
+        self.assertEqual(row.pack_value(touched, deleted), row.pack_value({b'\x02' * 20, b'\x01' * 20}, deleted))
+
+    def test_db_state_legacy_sizes(self):
+        row = prefixes.DBStatePrefixRow
+        packed = row.pack_value(TX_HASH, 1000, 2000, TX_HASH, 3, 4, True, False, 7, 8, 9, 10, 500, 600)
+        self.assertEqual(102, len(packed))
+        state = row.unpack_value(packed)
+        self.assertEqual((TX_HASH, 1000, 2000, TX_HASH, 3, 4), tuple(state)[:6])
+        self.assertTrue(state.catching_up)
+        self.assertFalse(state.index_address_statuses)
+        self.assertEqual(500, state.es_sync_height)
+        self.assertEqual(600, state.hashX_status_last_indexed_height)
+        # pre es_sync_height snapshots are 94 bytes; both trailing height
+        # fields fall back to the db height
+        legacy = row.unpack_value(packed[:94])
+        self.assertEqual(1000, legacy.es_sync_height)
+        self.assertEqual(1000, legacy.hashX_status_last_indexed_height)
+        # 98 byte snapshots already carry es_sync_height
+        legacy = row.unpack_value(packed[:98])
+        self.assertEqual(500, legacy.es_sync_height)
+        self.assertEqual(1000, legacy.hashX_status_last_indexed_height)
+
+    def test_hasher_key_round_trip(self):
+        # the value wraps live sha256 state, so only the key is checked here
+        key = prefixes.HashXHistoryHasherPrefixRow.pack_key(HASHX)
+        self.assertEqual((HASHX,), tuple(prefixes.HashXHistoryHasherPrefixRow.unpack_key(key)))
+
+    def test_auto_decode(self):
+        key, value = prefixes.ClaimToSupportPrefixRow.pack_item(CLAIM_HASH, 1, 2, 500)
+        decoded_key, decoded_value = auto_decode_item(key, value)
+        self.assertEqual((CLAIM_HASH, 1, 2), tuple(decoded_key))
+        self.assertEqual((500,), tuple(decoded_value))
+        # unknown prefixes pass through untouched
+        self.assertNotIn(b'\xff', ROW_TYPES)
+        self.assertEqual((b'\xffkey', b'value'), auto_decode_item(b'\xffkey', b'value'))
+
+        pairs = [
+            prefixes.TxCountPrefixRow.pack_item(1, 10),
+            prefixes.TxCountPrefixRow.pack_item(2, 20),
+            (b'\xffkey', b'value'),
+            prefixes.ChannelCountPrefixRow.pack_item(CLAIM_HASH, 7),
+        ]
+        self.assertEqual(
+            [((1,), (10,)), ((2,), (20,)), (b'\xffkey', b'value'), ((CLAIM_HASH,), (7,))],
+            list(auto_decode_items(pairs))
+        )